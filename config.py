@@ -1,14 +1,81 @@
 """
 Configuration management for brain-rot-bot video generator.
 """
+import copyreg
 import os
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
+from functools import cached_property
+from dotenv import load_dotenv, dotenv_values
+
+_ENV_FILE = Path(__file__).parent / ".env"
+_ENV_CACHE_FILE = Path(__file__).parent / ".env.cache.py"
+
+
+def _load_env_fast() -> None:
+    """
+    Load .env into os.environ, re-parsing it only when it has changed.
+
+    Parsed values are cached in .env.cache.py alongside the mtime of .env;
+    on a cache hit the dotenv parser is skipped entirely. Like load_dotenv(),
+    variables already set in the environment are not overridden.
+    """
+    try:
+        mtime = _ENV_FILE.stat().st_mtime_ns
+    except OSError:
+        return
+
+    cached = {}
+    try:
+        exec(_ENV_CACHE_FILE.read_text(encoding="utf-8"), cached)
+    except (OSError, SyntaxError):
+        pass
+
+    if cached.get("MTIME") == mtime:
+        values = cached["ENV"]
+    else:
+        values = {k: v for k, v in dotenv_values(_ENV_FILE).items() if v is not None}
+        try:
+            _ENV_CACHE_FILE.write_text(f"ENV = {values!r}\nMTIME = {mtime}\n", encoding="utf-8")
+        except OSError:
+            pass
+
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
 
 # Load environment variables from .env file
-load_dotenv()
+_load_env_fast()
+
+# Snapshot of the environment, read once at import instead of per field
+_ENV = os.environ.copy()
+
+
+def refresh_env_cache() -> None:
+    """Reload .env and rebuild the cached environment snapshot."""
+    global _ENV
+    load_dotenv(_ENV_FILE, override=True)
+    _ENV = os.environ.copy()
+
+
+def _frozen(mapping: Dict) -> MappingProxyType:
+    """Wrap a dict in a read-only proxy (also the proxy's pickle constructor)."""
+    return MappingProxyType(mapping)
+
+
+# mappingproxy has no pickle/deepcopy support of its own; rebuild it from a
+# plain dict copy so configs holding one can still be copied and pickled
+copyreg.pickle(MappingProxyType, lambda proxy: (_frozen, (dict(proxy),)))
+
+# Meme voice profiles, immutable and shared by every TTSConfig
+_MEME_VOICES = _frozen({
+    "meme-boy": _frozen({"voice": "nova", "speed": 1.1, "pitch": 1.05}),
+    "sigma-narrator": _frozen({"voice": "onyx", "speed": 0.95, "pitch": 0.98}),
+    "uwu": _frozen({"voice": "shimmer", "speed": 1.15, "pitch": 1.2}),
+    "deep-epic": _frozen({"voice": "echo", "speed": 0.9, "pitch": 0.92}),
+})
 
 
 @dataclass
@@ -17,15 +84,11 @@ class TTSConfig:
     provider: str = "elevenlabs"  # "openai" or "elevenlabs" - switched to elevenlabs for testing
     model: str = "tts-1"  # OpenAI: "tts-1" or "tts-1-hd"
     voice: str = "alloy"  # OpenAI voices: alloy, echo, fable, onyx, nova, shimmer
-    # Meme voice profiles
-    meme_voices: Dict[str, Dict[str, Any]] = field(default_factory=lambda: {
-        "meme-boy": {"voice": "nova", "speed": 1.1, "pitch": 1.05},
-        "sigma-narrator": {"voice": "onyx", "speed": 0.95, "pitch": 0.98},
-        "uwu": {"voice": "shimmer", "speed": 1.15, "pitch": 1.2},
-        "deep-epic": {"voice": "echo", "speed": 0.9, "pitch": 0.92},
-    })
-    elevenlabs_api_key: str = os.getenv("ELEVENLABS_API_KEY", "")
-    elevenlabs_voice_id: str = os.getenv("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL")  # Default: Sarah voice
+    # Meme voice profiles (shared, read-only)
+    meme_voices: Mapping[str, Mapping[str, Any]] = field(default_factory=lambda: _MEME_VOICES)
+    elevenlabs_api_key: str = field(default_factory=lambda: _ENV.get("ELEVENLABS_API_KEY", ""))
+    elevenlabs_voice_id: str = field(default_factory=lambda: _ENV.get("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL"))  # Default: Sarah voice
+    use_cache: bool = True  # Reuse audio + timestamps for identical requests (see paths.tts_cache)
 
 
 @dataclass
@@ -54,6 +117,9 @@ class VideoConfig:
     background_folder: str = "assets/background_clips"
     auto_loop: bool = True
     crop_mode: str = "center"  # "center", "smart", "fit"
+    encode_threads: Optional[int] = None  # None = os.cpu_count()
+    encode_preset: str = "veryfast"  # x264 preset; "medium" for final renders
+    cache_backgrounds: bool = False  # Reuse cropped/scaled backgrounds (see paths.bg_cache)
 
 
 @dataclass
@@ -68,12 +134,28 @@ class PathConfig:
     background_clips: Path = field(default_factory=lambda: Path("assets/background_clips"))
     fonts: Path = field(default_factory=lambda: Path("assets/fonts"))
     overlays: Path = field(default_factory=lambda: Path("assets/overlays"))
+    tts_cache: Path = field(default_factory=lambda: Path("tts_cache"))
+    bg_cache: Path = field(default_factory=lambda: Path("bg_cache"))
 
     def __post_init__(self):
-        """Ensure all directories exist."""
-        for path in [self.scripts_todo, self.scripts_processed, self.renders, 
-                     self.logs, self.background_clips, self.fonts, self.overlays]:
-            path.mkdir(parents=True, exist_ok=True)
+        """Ensure all directories exist (set BRB_ENSURE_DIRS=0 to skip)."""
+        if _ENV.get("BRB_ENSURE_DIRS", "1") == "0":
+            return
+
+        paths = sorted([self.scripts_todo, self.scripts_processed, self.renders,
+                        self.logs, self.background_clips, self.fonts, self.overlays],
+                       key=lambda p: len(p.parts))
+        # Only walk the ancestor chain for the first path under each parent
+        seen = set()
+        for path in paths:
+            if path in seen:
+                continue
+            if path.parent in seen:
+                path.mkdir(exist_ok=True)
+            else:
+                path.mkdir(parents=True, exist_ok=True)
+            seen.add(path)
+            seen.update(path.parents)
 
 
 @dataclass
@@ -82,14 +164,14 @@ class Config:
     tts: TTSConfig = field(default_factory=TTSConfig)
     subtitles: SubtitleConfig = field(default_factory=SubtitleConfig)
     video: VideoConfig = field(default_factory=VideoConfig)
-    paths: PathConfig = field(default_factory=PathConfig)
-    openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
+    openai_api_key: str = field(default_factory=lambda: _ENV.get("OPENAI_API_KEY", ""))
     automation_mode: bool = False
     log_level: str = "INFO"
 
-    def __post_init__(self):
-        """Initialize paths after creation."""
-        self.paths.__post_init__()
+    @cached_property
+    def paths(self) -> PathConfig:
+        """Path configuration, created (with its directories) on first access."""
+        return PathConfig()
 
 
 # Global config instance
@@ -9,26 +9,28 @@ import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
 
 from config import config
-from video.render import render_video
-
-
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, config.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(config.paths.logs / f"brain_rot_bot_{datetime.now().strftime('%Y%m%d')}.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from video.render import render_video, render_video_batch
+
+
 logger = logging.getLogger(__name__)
 
+# Valid --voice choices
+_MEME_VOICE_KEYS = tuple(config.tts.meme_voices) + ("default",)
+
+
+def setup_logging():
+    """Configure console and file logging (creates the logs directory)."""
+    logging.basicConfig(
+        level=getattr(logging, config.log_level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(config.paths.logs / f"brain_rot_bot_{datetime.now().strftime('%Y%m%d')}.log"),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
 
 def process_script_file(script_path: Path) -> str:
     """
@@ -88,9 +90,51 @@ def process_single_script(
     return video_path
 
 
-def automation_mode():
+def _render_script_file(script_path: Path) -> Path:
+    """
+    Read a script file and render it with the automation defaults.
+    
+    Args:
+        script_path: Path to script file
+    
+    Returns:
+        Path to generated video
+    """
+    logger.info(f"Processing: {script_path.name}")
+    
+    # Read script
+    script_text = process_script_file(script_path)
+    
+    # Generate video
+    return process_single_script(
+        script_text=script_text,
+        voice_profile=None,  # Can be configured per-file or random
+        subtitle_style="standard"
+    )
+
+
+def _move_to_processed(script_file: Path, processed_dir: Path, error: Optional[Exception] = None):
+    """Move a script to the processed directory (suffixed .error on failure)."""
+    if error is None:
+        script_file.rename(processed_dir / script_file.name)
+        logger.info(f"Moved {script_file.name} to processed")
+        return
+    
+    logger.error(f"Error processing {script_file.name}: {error}", exc_info=error)
+    # Move to processed anyway to avoid reprocessing
+    try:
+        script_file.rename(processed_dir / f"{script_file.name}.error")
+    except:
+        pass
+
+
+def automation_mode(jobs: int = 1):
     """
     Automation mode: process all scripts from scripts/todo/ directory.
+    
+    Args:
+        jobs: Number of scripts to render concurrently (encodes stay capped
+            at video.render.MAX_CONCURRENT_ENCODES)
     """
     logger.info("Starting automation mode...")
     
@@ -106,32 +150,43 @@ def automation_mode():
     
     logger.info(f"Found {len(script_files)} script(s) to process")
     
-    for script_file in script_files:
-        try:
-            logger.info(f"Processing: {script_file.name}")
-            
-            # Read script
-            script_text = process_script_file(script_file)
-            
-            # Generate video
-            video_path = process_single_script(
-                script_text=script_text,
-                voice_profile=None,  # Can be configured per-file or random
-                subtitle_style="standard"
-            )
-            
-            # Move script to processed
-            processed_path = processed_dir / script_file.name
-            script_file.rename(processed_path)
-            logger.info(f"Moved {script_file.name} to processed")
-            
-        except Exception as e:
-            logger.error(f"Error processing {script_file.name}: {e}", exc_info=True)
-            # Move to processed anyway to avoid reprocessing
+    if jobs <= 1:
+        for script_file in script_files:
+            try:
+                _render_script_file(script_file)
+            except Exception as e:
+                _move_to_processed(script_file, processed_dir, e)
+            else:
+                _move_to_processed(script_file, processed_dir)
+    else:
+        # Render as one batch: TTS requests overlap, while the batch caps
+        # concurrent encodes (NVENC sessions) and splits encoder threads
+        batch_files, scripts = [], []
+        for script_file in script_files:
             try:
-                script_file.rename(processed_dir / f"{script_file.name}.error")
-            except:
-                pass
+                scripts.append(process_script_file(script_file))
+            except Exception as e:
+                _move_to_processed(script_file, processed_dir, e)
+            else:
+                batch_files.append(script_file)
+        
+        date_str = datetime.now().strftime("%Y-%m-%d")
+        logger.info(f"Rendering with {jobs} parallel jobs")
+        results = render_video_batch(
+            scripts,
+            config.paths.renders / date_str,
+            voice_profile=None,
+            subtitle_style="standard",
+            max_workers=jobs,
+            return_exceptions=True,
+            config=config
+        )
+        for script_file, result in zip(batch_files, results):
+            if isinstance(result, Exception):
+                _move_to_processed(script_file, processed_dir, result)
+            else:
+                logger.info(f"Video generated: {result[0]}")
+                _move_to_processed(script_file, processed_dir)
     
     logger.info("Automation mode complete")
 
@@ -185,7 +240,7 @@ Examples:
     parser.add_argument(
         "--voice",
         type=str,
-        choices=list(config.tts.meme_voices.keys()) + ["default"],
+        choices=_MEME_VOICE_KEYS,
         default="default",
         help="Meme voice profile to use"
     )
@@ -204,6 +259,15 @@ Examples:
         help="Specific background clip to use (default: random)"
     )
     
+    # Automation option
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of scripts to render concurrently in automation mode (default: 1)"
+    )
+    
     # Output option
     parser.add_argument(
         "--output",
@@ -213,6 +277,9 @@ Examples:
     
     args = parser.parse_args()
     
+    # Setup logging
+    setup_logging()
+    
     # Interactive mode
     if args.interactive:
         from main_interactive import main as interactive_main
@@ -221,7 +288,7 @@ Examples:
     
     # Automation mode
     if args.automation:
-        automation_mode()
+        automation_mode(jobs=args.jobs)
         return
     
     # Get script text
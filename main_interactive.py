@@ -7,14 +7,10 @@ import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 from config import config
 from video.render import render_video
-from video.background_selector import select_background_clip
+from video.background_selector import select_background_clip, list_video_files
 import logging
 
 # Setup logging
@@ -24,6 +20,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_MEME_VOICE_KEYS = tuple(config.tts.meme_voices)
+
 
 def print_header():
     """Print welcome header."""
@@ -37,18 +35,17 @@ def get_input_text() -> str:
     print("📝 Enter your script text:")
     print("   (Press Enter twice or Ctrl+D when done)\n")
     
+    # Read raw lines (newlines kept) and strip only the joined result.
+    # Stdin is read line by line rather than to EOF so later prompts can
+    # still be answered from a pipe.
     lines = []
-    try:
-        while True:
-            line = input()
-            if not line.strip() and lines:  # Empty line after content
-                break
-            if line.strip():
-                lines.append(line)
-    except EOFError:
-        pass
+    for line in iter(sys.stdin.readline, ""):
+        if not line.isspace():
+            lines.append(line)
+        elif lines:  # Empty line after content
+            break
     
-    text = "\n".join(lines).strip()
+    text = "".join(lines).strip()
     
     if not text:
         print("❌ No text provided. Exiting.")
@@ -66,12 +63,7 @@ def select_background_video() -> Optional[Path]:
         bg_folder.mkdir(parents=True, exist_ok=True)
     
     # Find all video files
-    video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
-    video_files = []
-    
-    for ext in video_extensions:
-        video_files.extend(list(bg_folder.glob(f"*{ext}")))
-        video_files.extend(list(bg_folder.glob(f"*{ext.upper()}")))
+    video_files = list_video_files(bg_folder)
     
     if not video_files:
         print("⚠️  No background videos found in assets/background_clips/")
@@ -108,7 +100,7 @@ def select_voice() -> Optional[str]:
     """Let user select voice profile."""
     print("🎤 Select voice profile:")
     
-    voices = list(config.tts.meme_voices.keys())
+    voices = _MEME_VOICE_KEYS
     print("   0. Default voice")
     for i, voice in enumerate(voices, 1):
         voice_info = config.tts.meme_voices[voice]
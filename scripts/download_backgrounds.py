@@ -8,13 +8,25 @@ Usage:
     python scripts/download_backgrounds.py --source pexels --query "minecraft parkour"
 """
 import argparse
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 
+# Max concurrent video downloads; also the connection pool size
+MAX_DOWNLOAD_WORKERS = 8
+
+# Shared HTTP session so Pexels API and CDN connections are reused
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_DOWNLOAD_WORKERS))
+
+
 def check_yt_dlp():
     """Check if yt-dlp is installed."""
     try:
@@ -60,7 +72,9 @@ def download_youtube_video(url: str, output_dir: Path, start_time: int = None, d
     
     try:
         print(f"📥 Downloading from YouTube: {url}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        # Let yt-dlp's progress go straight to the terminal; only stderr is
+        # captured, for the error message
+        subprocess.run(cmd, stderr=subprocess.PIPE, text=True, check=True)
         print("✅ Download successful!")
         return True
     except subprocess.CalledProcessError as e:
@@ -68,6 +82,29 @@ def download_youtube_video(url: str, output_dir: Path, start_time: int = None, d
         return False
 
 
+# Serializes progress output from download worker threads
+_print_lock = threading.Lock()
+
+
+def _download_one(video_url: str, filepath: Path):
+    """
+    Download a single video file to disk.
+    
+    Args:
+        video_url: Direct URL of the video file
+        filepath: Destination path
+    """
+    with SESSION.get(video_url, stream=True) as video_response:
+        video_response.raise_for_status()
+        video_response.raw.decode_content = True
+        
+        with open(filepath, 'wb') as f:
+            shutil.copyfileobj(video_response.raw, f, length=1024 * 1024)
+    
+    with _print_lock:
+        print(f"  ✅ Saved: {filepath.name}")
+
+
 def download_pexels_video(query: str, output_dir: Path, per_page: int = 5):
     """
     Download videos from Pexels (free stock videos).
@@ -91,7 +128,7 @@ def download_pexels_video(query: str, output_dir: Path, per_page: int = 5):
     params = {"query": query, "per_page": per_page, "orientation": "portrait"}
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = SESSION.get(url, headers=headers, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -102,7 +139,8 @@ def download_pexels_video(query: str, output_dir: Path, per_page: int = 5):
         
         print(f"📥 Found {len(videos)} videos. Downloading...")
         
-        for i, video in enumerate(videos[:per_page]):
+        tasks = []
+        for video in videos[:per_page]:
             # Get best quality video file
             video_files = video.get('video_files', [])
             if not video_files:
@@ -115,19 +153,22 @@ def download_pexels_video(query: str, output_dir: Path, per_page: int = 5):
             if not video_url:
                 continue
             
-            # Download video
             filename = f"pexels_{video['id']}.mp4"
-            filepath = output_dir / filename
-            
-            print(f"  Downloading {i+1}/{len(videos[:per_page])}: {video.get('id')}")
-            video_response = requests.get(video_url, stream=True)
-            video_response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                for chunk in video_response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"  ✅ Saved: {filename}")
+            tasks.append((video_url, output_dir / filename))
+        
+        if not tasks:
+            print("❌ No downloadable video files found")
+            return False
+        
+        # Download videos concurrently (network-bound)
+        print(f"  Downloading {len(tasks)} video(s)...")
+        with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(tasks))) as executor:
+            futures = [
+                executor.submit(_download_one, video_url, filepath)
+                for video_url, filepath in tasks
+            ]
+            for future in futures:
+                future.result()
         
         print("✅ All downloads complete!")
         return True
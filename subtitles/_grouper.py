@@ -0,0 +1,69 @@
+"""
+Word-to-line grouping shared by the subtitle generators.
+"""
+from typing import Dict, List, Tuple
+
+
+# Trailing characters that end a sentence (force a line break)
+_SENTENCE_END = frozenset('.!?')
+
+
+def group_spans(words: List[Dict], max_words_per_line: int = 6) -> List[Tuple[int, int, float, float]]:
+    """
+    Find subtitle line boundaries as spans of word indices.
+    
+    A line breaks after max_words_per_line words, after sentence-ending
+    punctuation, or after a comma once it has at least 3 words.
+    
+    Args:
+        words: List of word dictionaries with 'word', 'start', 'end'
+        max_words_per_line: Maximum words per subtitle line
+    
+    Returns:
+        List of (first_index, last_index, start_time, end_time) tuples
+    """
+    spans = []
+    first = 0
+    count = 0
+    
+    for i, word_obj in enumerate(words):
+        word = word_obj.get("word", "")
+        count += 1
+        
+        last = word[-1] if word else ''
+        if (count >= max_words_per_line or
+                last in _SENTENCE_END or
+                (last == ',' and count >= 3)):
+            spans.append((first, i, words[first].get("start", 0.0), word_obj.get("end", 0.0)))
+            first = i + 1
+            count = 0
+    
+    # Add remaining words
+    if count:
+        spans.append((first, len(words) - 1, words[first].get("start", 0.0), words[-1].get("end", 0.0)))
+    
+    return spans
+
+
+def group_words_into_lines(words: List[Dict], max_words_per_line: int = 6) -> List[Dict]:
+    """
+    Group words into subtitle lines.
+    
+    Args:
+        words: List of word dictionaries with 'word', 'start', 'end'
+        max_words_per_line: Maximum words per subtitle line
+    
+    Returns:
+        List of line dictionaries with 'text', 'start', 'end', 'words'
+    """
+    lines = []
+    for first, last, start, end in group_spans(words, max_words_per_line):
+        line_words = words[first:last + 1]
+        lines.append({
+            "text": " ".join(w.get("word", "") for w in line_words),
+            "start": start,
+            "end": end,
+            "words": line_words
+        })
+    
+    return lines
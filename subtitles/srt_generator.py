@@ -1,8 +1,11 @@
 """
 SRT subtitle file generator from word timestamps.
 """
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
+
+from ._grouper import group_words_into_lines
 
 
 def generate_srt(timestamps: Dict, output_path: Path) -> Path:
@@ -29,73 +32,16 @@ def generate_srt(timestamps: Dict, output_path: Path) -> Path:
         end_time = format_srt_time(line["end"])
         text = line["text"]
         
-        srt_content.append(f"{idx}\n")
-        srt_content.append(f"{start_time} --> {end_time}\n")
-        srt_content.append(f"{text}\n")
-        srt_content.append("\n")
+        srt_content.append(f"{idx}\n{start_time} --> {end_time}\n{text}\n\n")
     
-    # Write SRT file
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.writelines(srt_content)
+    # Write SRT file in a single call
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("".join(srt_content))
     
     return output_path
 
 
-def group_words_into_lines(words: List[Dict], max_words_per_line: int = 6) -> List[Dict]:
-    """
-    Group words into subtitle lines.
-    
-    Args:
-        words: List of word dictionaries with 'word', 'start', 'end'
-        max_words_per_line: Maximum words per subtitle line
-    
-    Returns:
-        List of line dictionaries with 'text', 'start', 'end'
-    """
-    lines = []
-    current_line_words = []
-    current_start = None
-    
-    for word_obj in words:
-        word = word_obj.get("word", "")
-        start = word_obj.get("start", 0.0)
-        end = word_obj.get("end", 0.0)
-        
-        if current_start is None:
-            current_start = start
-        
-        current_line_words.append(word)
-        
-        # Create line when max words reached or on punctuation
-        should_break = (
-            len(current_line_words) >= max_words_per_line or
-            word.endswith(('.', '!', '?')) or
-            word.endswith(',') and len(current_line_words) >= 3
-        )
-        
-        if should_break:
-            line_text = " ".join(current_line_words)
-            lines.append({
-                "text": line_text,
-                "start": current_start,
-                "end": end
-            })
-            current_line_words = []
-            current_start = None
-    
-    # Add remaining words
-    if current_line_words:
-        last_word = words[-1]
-        line_text = " ".join(current_line_words)
-        lines.append({
-            "text": line_text,
-            "start": current_start or last_word.get("start", 0.0),
-            "end": last_word.get("end", 0.0)
-        })
-    
-    return lines
-
-
+@lru_cache(maxsize=4096)
 def format_srt_time(seconds: float) -> str:
     """
     Format seconds to SRT time format (HH:MM:SS,mmm).
@@ -106,10 +52,10 @@ def format_srt_time(seconds: float) -> str:
     Returns:
         Formatted time string
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
+    total_ms = round(seconds * 1000)
+    hours, rem = divmod(total_ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, millis = divmod(rem, 1000)
     
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
@@ -2,11 +2,17 @@
 Utility functions for subtitle processing.
 """
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 from config import Config
 
-from .srt_generator import generate_srt, group_words_into_lines
-from .ass_karaoke import generate_ass_karaoke
+from ._grouper import group_words_into_lines
+from .srt_generator import generate_srt
+from .ass_karaoke import (
+    create_k_tag_line, escape_ass_text, format_ass_time, color_to_ass
+)
+
+# ASS numpad alignment for each subtitle position (bottom/middle/top centre)
+_ASS_ALIGNMENT = {"bottom": 2, "center": 5, "top": 8}
 
 
 def generate_subtitles(
@@ -32,19 +38,79 @@ def generate_subtitles(
         config = global_config
     
     if style == "karaoke":
-        return generate_ass_karaoke(
-            timestamps=timestamps,
-            output_path=Path(f"{output_path}.ass"),
-            font_size=config.subtitles.font_size,
-            font_color=config.subtitles.font_color,
-            stroke_color=config.subtitles.stroke_color,
-            stroke_width=config.subtitles.stroke_width,
-            highlight_color=config.subtitles.karaoke_highlight_color,
-            position=config.subtitles.position,
-            margin_bottom=config.subtitles.margin_bottom
-        )
+        lines = group_words_into_lines(timestamps.get("words", []), max_words_per_line=6)
+        return write_ass(lines, Path(f"{output_path}.ass"), config, style)
     else:
         return generate_srt(
             timestamps=timestamps,
             output_path=Path(f"{output_path}.srt")
         )
+
+
+def write_ass(
+    lines: List[Dict],
+    path: Path,
+    cfg: Config,
+    style: Optional[str] = None
+) -> Path:
+    """
+    Write grouped subtitle lines as an ASS file for ffmpeg's libass filter.
+    
+    The script resolution matches the output video so font sizes and margins
+    are in output pixels.
+    
+    Args:
+        lines: Lines from group_words_into_lines
+        path: Path to save ASS file
+        cfg: Configuration object
+        style: "standard" or "karaoke" (defaults to cfg.subtitles.style)
+    
+    Returns:
+        Path to generated ASS file
+    """
+    sub_cfg = cfg.subtitles
+    if style is None:
+        style = sub_cfg.style
+    
+    # Karaoke lines are sung from SecondaryColour (base) into PrimaryColour
+    # (highlight); standard lines only use PrimaryColour
+    base = color_to_ass(sub_cfg.font_color)
+    highlight = color_to_ass(sub_cfg.karaoke_highlight_color)
+    if style == "karaoke":
+        primary, secondary = highlight, base
+    else:
+        primary, secondary = base, highlight
+    outline = color_to_ass(sub_cfg.stroke_color)
+    alignment = _ASS_ALIGNMENT.get(sub_cfg.position, 2)
+    margin_v = sub_cfg.margin_bottom if alignment != 5 else 0
+    
+    header = (
+        "[Script Info]\n"
+        "Title: Brain Rot Bot Subtitles\n"
+        "ScriptType: v4.00+\n"
+        f"PlayResX: {cfg.video.width}\n"
+        f"PlayResY: {cfg.video.height}\n"
+        "WrapStyle: 0\n"
+        "ScaledBorderAndShadow: yes\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        f"Style: Default,Arial,{sub_cfg.font_size},&H00{primary},&H00{secondary},&H00{outline},&H80000000,-1,0,0,0,100,100,0,0,1,{sub_cfg.stroke_width},0,{alignment},50,50,{margin_v},1\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+    
+    def dialogue_lines():
+        for line in lines:
+            if style == "karaoke":
+                text = create_k_tag_line(line["words"])
+            else:
+                text = escape_ass_text(line["text"])
+            yield f"Dialogue: 0,{format_ass_time(line['start'])},{format_ass_time(line['end'])},Default,,0,0,0,,{text}\n"
+    
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(header)
+        f.writelines(dialogue_lines())
+    
+    return path
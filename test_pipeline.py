@@ -11,8 +11,11 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import config
 from tts.tts_router import generate_tts
+from tts.elevenlabs_tts import alignment_to_word_timestamps
 from subtitles.subtitle_utils import generate_subtitles
-from video.background_selector import select_background_clip
+from subtitles.ass_karaoke import create_k_tag_line
+from subtitles._grouper import group_spans
+from video.background_selector import select_background_clip, _background_geometry
 
 
 def test_config():
@@ -94,6 +97,75 @@ def test_background_selection():
         return False
 
 
+def test_alignment_words():
+    """Test splitting ElevenLabs character alignment into words."""
+    print("\n🧪 Testing alignment to word timestamps...")
+    chars = list("Hi,  you!\nok")
+    alignment = {
+        "characters": chars,
+        "character_start_times_seconds": [i * 0.1 for i in range(len(chars))],
+        "character_end_times_seconds": [i * 0.1 + 0.1 for i in range(len(chars))]
+    }
+    
+    words = alignment_to_word_timestamps(alignment)
+    
+    # Runs of whitespace (including newlines) split words; punctuation stays attached
+    assert [w["word"] for w in words] == ["Hi,", "you!", "ok"]
+    assert words[1]["start"] == 5 * 0.1 and words[1]["end"] == 8 * 0.1 + 0.1
+    assert words[-1]["end"] == 11 * 0.1 + 0.1
+    print("✅ Alignment split into words")
+    return True
+
+
+def test_karaoke_tags():
+    """Test karaoke \\k durations, including gaps and overlaps."""
+    print("\n🧪 Testing karaoke tags...")
+    words = [
+        {"word": "a", "start": 1.0, "end": 1.4},
+        {"word": "b", "start": 1.6, "end": 2.0},  # 0.2s pause before b
+        {"word": "c", "start": 1.9, "end": 2.3},  # overlaps b
+    ]
+    
+    # Each word lasts until the next starts; overlaps never go negative
+    assert create_k_tag_line(words) == "{\\k60}a {\\k30}b {\\k40}c"
+    assert create_k_tag_line([{"word": "{x}", "start": 0.0, "end": 0.5}]) == "{\\k50}\\{x\\}"
+    print("✅ Karaoke tags timed correctly")
+    return True
+
+
+def test_line_grouping():
+    """Test subtitle line boundaries."""
+    print("\n🧪 Testing line grouping...")
+    words = [
+        {"word": "Hello", "start": 0.0, "end": 0.4},
+        {"word": "world.", "start": 0.4, "end": 0.9},
+        {"word": "one", "start": 1.0, "end": 1.2},
+        {"word": "two", "start": 1.2, "end": 1.5},
+    ]
+    
+    assert group_spans(words) == [(0, 1, 0.0, 0.9), (2, 3, 1.0, 1.5)]
+    # A trailing line starting at 0.0 keeps that start
+    assert group_spans(words[:1]) == [(0, 0, 0.0, 0.4)]
+    assert group_spans(words[2:], max_words_per_line=1) == [(0, 0, 1.0, 1.2), (1, 1, 1.2, 1.5)]
+    print("✅ Lines grouped correctly")
+    return True
+
+
+def test_background_geometry():
+    """Test background crop/scale/pad geometry."""
+    print("\n🧪 Testing background geometry...")
+    # Landscape into 9:16: centre crop the width
+    assert _background_geometry(1920, 1080, 1080, 1920, "center") == ((607, 1080, 656, 0), (1080, 1920), None)
+    # Tall clip: centre crop the height
+    assert _background_geometry(720, 1600, 1080, 1920, "smart") == ((720, 1280, 0, 160), (1080, 1920), None)
+    # Fit: whole frame scaled inside the target and letterboxed
+    assert _background_geometry(1920, 1080, 1080, 1920, "fit") == ((1920, 1080, 0, 0), (1080, 607), (0, 656))
+    # Fit with matching aspect ratio needs no pad
+    assert _background_geometry(540, 960, 1080, 1920, "fit") == ((540, 960, 0, 0), (1080, 1920), None)
+    print("✅ Background geometry correct")
+    return True
+
+
 def main():
     """Run all tests."""
     print("🧠 Brain Rot Bot - Pipeline Test\n")
@@ -102,6 +174,10 @@ def main():
     tests = [
         ("Configuration", test_config),
         ("Subtitle Generation", test_subtitles),
+        ("Alignment Words", test_alignment_words),
+        ("Karaoke Tags", test_karaoke_tags),
+        ("Line Grouping", test_line_grouping),
+        ("Background Geometry", test_background_geometry),
         ("Background Selection", test_background_selection),
         ("TTS Generation", test_tts),  # Last because it requires API key
     ]
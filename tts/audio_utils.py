@@ -0,0 +1,62 @@
+"""
+Helper functions shared by the TTS providers.
+"""
+import json
+from pathlib import Path
+from typing import Dict
+
+try:
+    from mutagen import MutagenError
+    from mutagen.mp3 import MP3
+except ImportError:  # Optional dependency
+    MP3 = None
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def get_audio_duration(audio_path: Path) -> float:
+    """
+    Get the duration of an MP3 file in seconds.
+    
+    Reads the MP3 headers with mutagen when available, falling back to
+    MoviePy (which spawns ffmpeg) if mutagen is missing or can't parse the file.
+    
+    Args:
+        audio_path: Path to audio file
+    
+    Returns:
+        Duration in seconds
+    """
+    if MP3 is not None:
+        try:
+            return MP3(str(audio_path)).info.length
+        except MutagenError:
+            pass
+    
+    from moviepy import AudioFileClip
+    
+    audio_clip = AudioFileClip(str(audio_path))
+    duration = audio_clip.duration
+    audio_clip.close()
+    return duration
+
+
+def save_timestamps(timestamps: Dict, timestamps_path: Path):
+    """
+    Write a timestamps dictionary as compact JSON.
+    
+    Uses orjson when available, otherwise the stdlib json module.
+    
+    Args:
+        timestamps: Timestamps dictionary
+        timestamps_path: Path to save JSON file
+    """
+    if orjson is not None:
+        with open(timestamps_path, "wb") as f:
+            f.write(orjson.dumps(timestamps))
+    else:
+        with open(timestamps_path, "w") as f:
+            json.dump(timestamps, f, separators=(",", ":"))
@@ -1,12 +1,33 @@
 """
 ElevenLabs TTS implementation with word-level timestamp support.
 """
-import json
+import base64
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import requests
-from moviepy import AudioFileClip
+
+from .audio_utils import get_audio_duration, save_timestamps
+from .openai_tts import _openai_client
+
+
+# Default model: free tier compatible
+DEFAULT_MODEL_ID = "eleven_turbo_v2_5"
+
+# Shared HTTP session so the connection to api.elevenlabs.io is kept alive
+_session = requests.Session()
+
+# Duration multipliers for pauses after trailing punctuation
+_PAUSE_MULTIPLIERS = {
+    '.': 1.5, '!': 1.5, '?': 1.5,   # Longer pause for sentence endings
+    ',': 1.25, ';': 1.25, ':': 1.25,  # Medium pause
+    "'": 1.1, '"': 1.1,  # Small pause
+}
+
+# Translation table that deletes vowels; len(word) - len(word.translate(...))
+# counts vowels in C instead of a per-character Python loop
+_VOWEL_DELETE = str.maketrans('', '', 'aeiouAEIOU')
 
 
 def generate_audio_with_timestamps(
@@ -14,7 +35,7 @@ def generate_audio_with_timestamps(
     output_path: Path,
     voice_id: str,
     api_key: Optional[str] = None,
-    model_id: str = "eleven_turbo_v2_5"  # Updated: free tier compatible model
+    model_id: str = DEFAULT_MODEL_ID
 ) -> Tuple[Path, Dict]:
     """
     Generate TTS audio using ElevenLabs API.
@@ -35,7 +56,6 @@ def generate_audio_with_timestamps(
     
     url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
     headers = {
-        "Accept": "audio/mpeg",
         "Content-Type": "application/json",
         "xi-api-key": api_key
     }
@@ -49,44 +69,102 @@ def generate_audio_with_timestamps(
         }
     }
     
-    response = requests.post(url, json=data, headers=headers)
-    response.raise_for_status()
-    
-    # Save audio
     audio_path = Path(f"{output_path}.mp3")
-    with open(audio_path, "wb") as f:
-        f.write(response.content)
+    
+    # Prefer the with-timestamps endpoint: audio and character alignment
+    # in one call, so no Whisper upload + transcription is needed
+    timestamps = None
+    try:
+        response = _session.post(
+            f"{url}/with-timestamps",
+            json=data,
+            headers={**headers, "Accept": "application/json"}
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        with open(audio_path, "wb") as f:
+            f.write(base64.b64decode(result["audio_base64"]))
+        
+        alignment = result.get("alignment")
+        if alignment:
+            timestamps = alignment_to_word_timestamps(alignment)
+    except requests.HTTPError as e:
+        print(f"⚠️  ElevenLabs timestamps endpoint failed, using Whisper alignment: {e}")
+        
+        # Save audio, streaming it to disk as it arrives
+        with _session.post(url, json=data, headers={**headers, "Accept": "audio/mpeg"}, stream=True) as response:
+            response.raise_for_status()
+            with open(audio_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    f.write(chunk)
     
     # Get duration
-    audio_clip = AudioFileClip(str(audio_path))
-    duration = audio_clip.duration
-    audio_clip.close()
-    
-    # Use Whisper API for accurate word-level timestamps (same as OpenAI)
-    # This provides much better synchronization than estimation
-    timestamps = generate_word_timestamps_with_whisper(
-        text, str(audio_path), duration
-    )
+    duration = get_audio_duration(audio_path)
+    
+    if not timestamps:
+        # Use Whisper API for accurate word-level timestamps (same as OpenAI)
+        # This provides much better synchronization than estimation
+        timestamps = generate_word_timestamps_with_whisper(text, str(audio_path))
     
     timestamps_dict = {
         "text": text,
         "duration": duration,
         "words": timestamps
     }
+    if timestamps is None:
+        # No alignment available: estimate, and flag it so it isn't cached
+        timestamps_dict["words"] = estimate_timestamps(text, duration)
+        timestamps_dict["estimated"] = True
     
     # Save timestamps
     timestamps_path = Path(f"{output_path}_timestamps.json")
-    with open(timestamps_path, "w") as f:
-        json.dump(timestamps_dict, f, indent=2)
+    save_timestamps(timestamps_dict, timestamps_path)
     
     return audio_path, timestamps_dict
 
 
+def alignment_to_word_timestamps(alignment: Dict) -> List[Dict]:
+    """
+    Convert ElevenLabs character alignment to word-level timestamps.
+    
+    Args:
+        alignment: Dictionary with 'characters', 'character_start_times_seconds'
+            and 'character_end_times_seconds' lists
+    
+    Returns:
+        List of word timestamp dictionaries
+    """
+    words = []
+    current_chars = []
+    word_start = word_end = 0.0
+    
+    for char, char_start, char_end in zip(
+        alignment["characters"],
+        alignment["character_start_times_seconds"],
+        alignment["character_end_times_seconds"]
+    ):
+        if char.isspace():
+            if current_chars:
+                words.append({"word": "".join(current_chars), "start": word_start, "end": word_end})
+                current_chars = []
+            continue
+        
+        if not current_chars:
+            word_start = char_start
+        current_chars.append(char)
+        word_end = max(word_end, char_end)
+    
+    if current_chars:
+        words.append({"word": "".join(current_chars), "start": word_start, "end": word_end})
+    
+    return words
+
+
 def generate_word_timestamps_with_whisper(
     text: str,
-    audio_path: str,
-    duration: float
-) -> List[Dict]:
+    audio_path: str
+) -> Optional[List[Dict]]:
     """
     Use Whisper API to get accurate word-level timestamps for ElevenLabs audio.
     This provides much better synchronization than estimation.
@@ -94,20 +172,17 @@ def generate_word_timestamps_with_whisper(
     Args:
         text: Original text
         audio_path: Path to audio file
-        duration: Audio duration in seconds
     
     Returns:
-        List of word timestamp dictionaries
+        List of word timestamp dictionaries, or None if Whisper is unavailable
     """
-    import openai
-    
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
-        # Fallback to estimation if OpenAI key not available
-        return estimate_timestamps(text, duration)
+        # No OpenAI key: the caller falls back to estimation
+        return None
     
     try:
-        client = openai.OpenAI(api_key=api_key)
+        client = _openai_client(api_key)
         
         # Transcribe with word-level timestamps
         with open(audio_path, "rb") as audio_file:
@@ -127,15 +202,12 @@ def generate_word_timestamps_with_whisper(
                     "start": word_obj.start,
                     "end": word_obj.end
                 })
-        else:
-            # Fallback to estimation
-            words = estimate_timestamps(text, duration)
         
-        return words
+        return words or None
     except Exception as e:
         # If Whisper fails, fall back to estimation
         print(f"⚠️  Whisper alignment failed, using estimation: {e}")
-        return estimate_timestamps(text, duration)
+        return None
 
 
 def estimate_timestamps(text: str, duration: float) -> List[Dict]:
@@ -153,51 +225,47 @@ def estimate_timestamps(text: str, duration: float) -> List[Dict]:
     if not words:
         return []
     
-    # More sophisticated estimation
-    time_per_char = duration / len(text)
-    words_data = []
-    current_time = 0.0
+    n = len(words)
+    
+    # More sophisticated estimation, computed for all words at once
+    char_counts = np.fromiter((len(word) for word in words), dtype=np.float64, count=n)
+    
+    # Spoken-character rate: whitespace between words isn't spoken
+    time_per_char = duration / char_counts.sum()
     
     # Improved estimation with better word timing
     # Account for speech rate variations
-    vowels = 'aeiouAEIOU'
+    vowel_counts = char_counts - np.fromiter(
+        (len(word.translate(_VOWEL_DELETE)) for word in words), dtype=np.float64, count=n
+    )
+    pause_mult = np.fromiter(
+        (_PAUSE_MULTIPLIERS.get(word[-1], 1.0) for word in words), dtype=np.float64, count=n
+    )
     
-    for i, word in enumerate(words):
-        # Base duration calculation
-        char_count = len(word)
-        vowel_count = sum(1 for c in word if c in vowels)
-        
-        # Words with more vowels tend to be spoken longer
-        base_duration = char_count * time_per_char * (1.0 + vowel_count * 0.1)
-        
-        # Adjust for punctuation pauses
-        if word.endswith(('.', '!', '?')):
-            base_duration *= 1.5  # Longer pause for sentence endings
-        elif word.endswith((',', ';', ':')):
-            base_duration *= 1.25  # Medium pause
-        elif word.endswith(("'", '"')):
-            base_duration *= 1.1  # Small pause
-        
-        # Adjust for word length (longer words take proportionally less time per char)
-        if char_count > 8:
-            base_duration *= 0.9
-        
-        # Add small gap between words
-        word_gap = 0.05 if i > 0 else 0.0
-        
-        words_data.append({
-            "word": word,
-            "start": current_time + word_gap,
-            "end": current_time + word_gap + base_duration
-        })
-        current_time += word_gap + base_duration
+    # Words with more vowels tend to be spoken longer
+    durations = char_counts * time_per_char * (1.0 + vowel_counts * 0.1)
+    
+    # Adjust for punctuation pauses
+    durations *= pause_mult
+    
+    # Adjust for word length (longer words take proportionally less time per char)
+    durations[char_counts > 8] *= 0.9
+    
+    # Add small gap between words
+    gaps = np.full(n, 0.05)
+    gaps[0] = 0.0
+    
+    ends = np.cumsum(gaps + durations)
+    starts = ends - durations
     
     # Normalize to match total duration (in case of drift)
-    if words_data and current_time > 0:
-        scale_factor = duration / current_time
-        for word_data in words_data:
-            word_data["start"] *= scale_factor
-            word_data["end"] *= scale_factor
+    total_time = ends[-1]
+    if total_time > 0:
+        scale_factor = duration / total_time
+        starts *= scale_factor
+        ends *= scale_factor
     
-    return words_data
-
+    return [
+        {"word": word, "start": start, "end": end}
+        for word, start, end in zip(words, starts.tolist(), ends.tolist())
+    ]
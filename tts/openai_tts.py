@@ -1,12 +1,19 @@
 """
 OpenAI TTS implementation with word-level timestamp support.
 """
-import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import openai
-from moviepy import AudioFileClip
+
+from .audio_utils import get_audio_duration, save_timestamps
+
+
+@lru_cache(maxsize=4)
+def _openai_client(api_key: str) -> openai.OpenAI:
+    """Return a shared OpenAI client per API key so connections are reused."""
+    return openai.OpenAI(api_key=api_key)
 
 
 def generate_audio_with_timestamps(
@@ -33,7 +40,7 @@ def generate_audio_with_timestamps(
     if not api_key:
         raise ValueError("OpenAI API key required. Set OPENAI_API_KEY env var or pass api_key.")
     
-    client = openai.OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
     
     # Generate audio
     audio_path = Path(f"{output_path}.mp3")
@@ -50,9 +57,7 @@ def generate_audio_with_timestamps(
             f.write(chunk)
     
     # Get audio duration
-    audio_clip = AudioFileClip(str(audio_path))
-    duration = audio_clip.duration
-    audio_clip.close()
+    duration = get_audio_duration(audio_path)
     
     # Generate word-level timestamps using Whisper
     # Note: OpenAI TTS doesn't provide timestamps directly, so we use Whisper for alignment
@@ -62,8 +67,7 @@ def generate_audio_with_timestamps(
     
     # Save timestamps
     timestamps_path = Path(f"{output_path}_timestamps.json")
-    with open(timestamps_path, "w") as f:
-        json.dump(timestamps, f, indent=2)
+    save_timestamps(timestamps, timestamps_path)
     
     return audio_path, timestamps
 
@@ -86,7 +90,7 @@ def generate_word_timestamps_with_whisper(
     Returns:
         Dictionary with word timestamps
     """
-    client = openai.OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
     
     # Transcribe with word-level timestamps
     with open(audio_path, "rb") as audio_file:
@@ -106,15 +110,18 @@ def generate_word_timestamps_with_whisper(
                 "start": word_obj.start,
                 "end": word_obj.end
             })
-    else:
-        # Fallback: estimate timestamps based on text length
-        words = estimate_timestamps(text, duration)
     
-    return {
+    timestamps = {
         "text": text,
         "duration": duration,
         "words": words
     }
+    if not words:
+        # Fallback: estimate timestamps based on text length
+        timestamps["words"] = estimate_timestamps(text, duration)
+        timestamps["estimated"] = True
+    
+    return timestamps
 
 
 def estimate_timestamps(text: str, duration: float) -> List[Dict]:
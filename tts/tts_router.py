@@ -1,13 +1,44 @@
 """
 TTS router that selects the appropriate TTS provider.
 """
+import errno
+import hashlib
+import json
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from config import Config, TTSConfig
 
 from .openai_tts import generate_audio_with_timestamps as openai_generate
 from .elevenlabs_tts import generate_audio_with_timestamps as elevenlabs_generate
+from .elevenlabs_tts import DEFAULT_MODEL_ID as ELEVENLABS_MODEL_ID
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """
+    Hardlink src to dst, falling back to a copy across filesystems.
+    
+    The link or copy is made under a temp name and renamed over dst, so an
+    existing dst (which may share its inode with an earlier render) is
+    replaced rather than written through.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(src, tmp)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM):
+                raise
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        # Also covers rename() being a no-op when dst already is src's inode
+        tmp.unlink(missing_ok=True)
 
 
 def generate_tts(
@@ -32,33 +63,109 @@ def generate_tts(
         from config import config as global_config
         config = global_config
     
+    tts_cfg = config.tts
+    
     # Get voice settings
-    if voice_profile and voice_profile in config.tts.meme_voices:
-        voice_settings = config.tts.meme_voices[voice_profile]
-        voice = voice_settings["voice"]
-    else:
-        voice = config.tts.voice
+    voice_settings = tts_cfg.meme_voices.get(voice_profile) if voice_profile else None
+    voice = voice_settings["voice"] if voice_settings else tts_cfg.voice
     
-    # Generate based on provider
-    if config.tts.provider == "openai":
-        return openai_generate(
+    # Resolve the provider call
+    provider = tts_cfg.provider
+    if provider == "openai":
+        voice_key, model = voice, tts_cfg.model
+        generate = partial(
+            openai_generate,
             text=text,
             output_path=output_path,
             voice=voice,
-            model=config.tts.model,
+            model=model,
             api_key=config.openai_api_key
         )
-    elif config.tts.provider == "elevenlabs":
+    elif provider == "elevenlabs":
         # Get API key from config or environment
-        api_key = config.tts.elevenlabs_api_key or os.getenv("ELEVENLABS_API_KEY")
-        voice_id = config.tts.elevenlabs_voice_id or os.getenv("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL")
+        api_key = tts_cfg.elevenlabs_api_key or os.getenv("ELEVENLABS_API_KEY")
+        voice_id = tts_cfg.elevenlabs_voice_id or os.getenv("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL")
         
-        return elevenlabs_generate(
+        voice_key, model = voice_id, ELEVENLABS_MODEL_ID
+        generate = partial(
+            elevenlabs_generate,
             text=text,
             output_path=output_path,
             voice_id=voice_id,
-            api_key=api_key
+            api_key=api_key,
+            model_id=model
         )
     else:
-        raise ValueError(f"Unknown TTS provider: {config.tts.provider}")
+        raise ValueError(f"Unknown TTS provider: {provider}")
+    
+    if not tts_cfg.use_cache:
+        return generate()
+    
+    # Content-addressed cache: identical requests skip the paid API round-trips
+    key = hashlib.sha256(f"{provider}|{voice_key}|{model}|{text}".encode("utf-8")).hexdigest()
+    cache_dir = config.paths.tts_cache
+    cached_audio = cache_dir / f"{key}.mp3"
+    cached_timestamps = cache_dir / f"{key}.json"
+    
+    audio_path = Path(f"{output_path}.mp3")
+    timestamps_path = Path(f"{output_path}_timestamps.json")
+    
+    if cached_audio.exists() and cached_timestamps.exists():
+        _link_or_copy(cached_audio, audio_path)
+        _link_or_copy(cached_timestamps, timestamps_path)
+        with open(timestamps_path, "r") as f:
+            return audio_path, json.load(f)
+    
+    audio_path, timestamps = generate()
+    if timestamps.get("estimated"):
+        # Estimated alignment is a stopgap; retry Whisper on the next run
+        return audio_path, timestamps
+    
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _link_or_copy(audio_path, cached_audio)
+    _link_or_copy(timestamps_path, cached_timestamps)
+    
+    return audio_path, timestamps
+
 
+def generate_tts_batch(
+    texts: List[str],
+    output_paths: List[Path],
+    voice_profile: Optional[str] = None,
+    config: Optional[Config] = None,
+    max_workers: int = 4,
+    return_exceptions: bool = False
+) -> List[Union[Tuple[Path, Dict], Exception]]:
+    """
+    Generate TTS audio with timestamps for several texts concurrently.
+    
+    Each item is network-bound (synthesis request + Whisper alignment),
+    so running them on a thread pool overlaps the API round-trips.
+    
+    Args:
+        texts: Input texts to convert
+        output_paths: Output path for each text (without extension)
+        voice_profile: Meme voice profile name applied to every text
+        config: Configuration object (uses global config if not provided)
+        max_workers: Maximum number of concurrent TTS requests
+        return_exceptions: Return a failed text's exception in its slot
+            instead of raising it
+    
+    Returns:
+        List of (audio_path, timestamps_dict) tuples (or exceptions), in input order
+    """
+    if len(texts) != len(output_paths):
+        raise ValueError("texts and output_paths must have the same length")
+    if not texts:
+        return []
+    
+    def generate(item):
+        try:
+            return generate_tts(item[0], item[1], voice_profile, config)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return e
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+        return list(executor.map(generate, zip(texts, output_paths)))
@@ -1,35 +1,45 @@
 """
 Background video clip selector and processor.
 """
+import hashlib
+import os
 import random
+import subprocess
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional, List
-from moviepy import VideoFileClip, CompositeVideoClip
+from typing import Optional, Dict, List, Tuple
+import numpy as np
+from moviepy import VideoClip
+from moviepy.config import FFMPEG_BINARY
 from config import Config
 
+from .utils import check_nvdec_available, check_nvenc_available, probe
 
-def select_background_clip(background_folder: Path, duration: float) -> Optional[Path]:
+
+_VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
+
+# folder -> (st_mtime_ns, video files) from the last scan
+_video_files_cache: Dict[Path, Tuple[int, List[Path]]] = {}
+
+
+def select_background_clip(background_folder: Path, duration: Optional[float] = None) -> Optional[Path]:
     """
     Select a random background clip from the folder.
     
     Args:
         background_folder: Path to folder containing background clips
-        duration: Required duration in seconds
+        duration: Required duration in seconds (unused: short clips are
+            looped, so selection doesn't have to wait for the TTS duration)
     
     Returns:
         Path to selected clip, or None if no clips found
     """
-    if not background_folder.exists():
+    try:
+        video_files = list_video_files(background_folder)
+    except OSError:  # Missing folder (or not a directory)
         return None
     
-    # Find all video files
-    video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.webm']
-    video_files = []
-    
-    for ext in video_extensions:
-        video_files.extend(list(background_folder.glob(f"*{ext}")))
-        video_files.extend(list(background_folder.glob(f"*{ext.upper()}")))
-    
     if not video_files:
         return None
     
@@ -37,16 +47,42 @@ def select_background_clip(background_folder: Path, duration: float) -> Optional
     return random.choice(video_files)
 
 
+def list_video_files(folder: Path) -> List[Path]:
+    """
+    List video files in a folder with a single directory scan.
+    
+    Results are cached per folder and reused until the folder's mtime
+    changes (i.e. a file is added, removed or renamed).
+    """
+    mtime_ns = os.stat(folder).st_mtime_ns
+    cached = _video_files_cache.get(folder)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    
+    with os.scandir(folder) as entries:
+        video_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file()
+            and os.path.splitext(entry.name)[1].lower() in _VIDEO_EXTENSIONS
+        )
+    _video_files_cache[folder] = (mtime_ns, video_files)
+    return video_files
+
+
 def prepare_background_clip(
     clip_path: Path,
     duration: float,
     target_width: int = 1080,
     target_height: int = 1920,
     crop_mode: str = "center"
-) -> VideoFileClip:
+) -> VideoClip:
     """
     Load and prepare background clip: loop, crop, and scale to target dimensions.
     
+    Decoding, cropping and scaling all happen inside a single ffmpeg process
+    (on the GPU via NVDEC when available), so only target-size frames reach
+    Python.
+    
     Args:
         clip_path: Path to background video
         duration: Target duration (will loop if needed)
@@ -55,91 +91,279 @@ def prepare_background_clip(
         crop_mode: Crop mode ("center", "smart", "fit")
     
     Returns:
-        Prepared VideoFileClip
+        Prepared VideoClip
+    """
+    input_args, filters, info = background_ffmpeg_args(
+        clip_path, target_width, target_height, crop_mode
+    )
+    
+    # Short clips are looped by ffmpeg's demuxer (-stream_loop) rather than
+    # by concatenating clip copies
+    loop_frames = None
+    if info["duration"] < duration:
+        loop_frames = info["n_frames"] or int(info["duration"] * info["fps"])
+    
+    reader = _FFmpegFrameReader(
+        clip_path, input_args, filters,
+        (target_width, target_height), info["fps"], loop_frames
+    )
+    if input_args:
+        # NVDEC decoders can be listed without a usable GPU: decode the first
+        # frame now and fall back to the CPU if that fails
+        try:
+            reader.get_frame(0)
+        except IOError:
+            reader.close()
+            _, filters, _ = background_ffmpeg_args(
+                clip_path, target_width, target_height, crop_mode, hwaccel=False
+            )
+            reader = _FFmpegFrameReader(
+                clip_path, [], filters,
+                (target_width, target_height), info["fps"], loop_frames
+            )
+    return _BackgroundClip(reader, duration)
+
+
+def prepare_background_file(
+    clip_path: Path,
+    target_width: int,
+    target_height: int,
+    crop_mode: str,
+    cache_dir: Path
+) -> Path:
+    """
+    Get a cropped and scaled copy of a background clip from a disk cache.
+    
+    The copy is encoded once per (source, source mtime, size, crop mode)
+    under cache_dir and keeps the source's length; renders loop it with
+    -stream_loop as they would the original, so one copy serves every
+    duration with no crop or scale work left to do.
+    
+    Args:
+        clip_path: Path to background video
+        target_width: Target video width
+        target_height: Target video height
+        crop_mode: Crop mode ("center", "smart", "fit")
+        cache_dir: Directory holding prepared backgrounds
+    
+    Returns:
+        Path to the prepared MP4
     """
-    clip = VideoFileClip(str(clip_path))
+    key = f"{Path(clip_path).resolve()}|{os.stat(clip_path).st_mtime_ns}|{target_width}x{target_height}|{crop_mode}"
+    cached_path = cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.mp4"
+    if cached_path.exists():
+        return cached_path
     
-    # Loop clip to match duration (MoviePy 2.x compatible)
-    if clip.duration < duration:
-        loops_needed = int(duration / clip.duration) + 1
-        # MoviePy 2.x: manually loop by concatenating
-        from moviepy import concatenate_videoclips
-        clips_list = [clip] * loops_needed
-        clip = concatenate_videoclips(clips_list)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Unique temp name so concurrent batch renders never see a partial file
+    tmp_path = cache_dir / f".{cached_path.stem}.{os.getpid()}.{threading.get_ident()}.mp4"
     
-    # Trim to exact duration (MoviePy 2.x uses subclipped instead of subclip)
-    clip = clip.subclipped(0, duration)
+    if check_nvenc_available():
+        codec_args = ['-c:v', 'h264_nvenc', '-preset', 'p1', '-cq', '18']
+    else:
+        codec_args = ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '18']
     
-    # Crop and scale to vertical format
-    clip = crop_and_scale_vertical(clip, target_width, target_height, crop_mode)
+    result = None
+    for hwaccel in (True, False):
+        input_args, filters, _ = background_ffmpeg_args(
+            clip_path, target_width, target_height, crop_mode, hwaccel
+        )
+        if result is not None and not input_args:
+            break  # CPU decode was already tried
+        cmd = [
+            FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+            *input_args, '-i', str(clip_path), '-an',
+            *(['-vf', ','.join(filters)] if filters else []),
+            *codec_args, '-pix_fmt', 'yuv420p',
+            str(tmp_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0:
+            os.replace(tmp_path, cached_path)
+            return cached_path
     
-    return clip
+    tmp_path.unlink(missing_ok=True)
+    raise RuntimeError(f"ffmpeg background prepare failed: {result.stderr.decode(errors='replace').strip()}")
 
 
-def crop_and_scale_vertical(
-    clip: VideoFileClip,
+def background_ffmpeg_args(
+    clip_path: Path,
+    target_width: int = 1080,
+    target_height: int = 1920,
+    crop_mode: str = "center",
+    hwaccel: bool = True
+) -> Tuple[List[str], List[str], Dict]:
+    """
+    Build the ffmpeg decode options and filters that crop and scale a clip.
+    
+    With hwaccel and a CUVID decoder for the source codec, cropping and
+    resizing happen in the NVDEC decoder itself so frames leave the GPU at
+    target size; otherwise a CPU crop+scale filter chain is returned.
+    
+    Args:
+        clip_path: Path to background video
+        target_width: Target video width
+        target_height: Target video height
+        crop_mode: Crop mode ("center", "smart", "fit")
+        hwaccel: Allow NVDEC decoding
+    
+    Returns:
+        Tuple of (input_args placed before -i, filters, probe() result)
+    """
+    info = probe(clip_path)
+    src_width, src_height = info["width"], info["height"]
+    
+    crop, scaled, pad = _background_geometry(src_width, src_height, target_width, target_height, crop_mode)
+    
+    codec = info["codec"]
+    if hwaccel and not info["rotation"] and codec and check_nvdec_available(codec):
+        crop_w, crop_h, x, y = crop
+        input_args = [
+            '-c:v', f'{codec}_cuvid',
+            '-crop', f'{y}x{src_height - crop_h - y}x{x}x{src_width - crop_w - x}',
+            '-resize', f'{scaled[0]}x{scaled[1]}'
+        ]
+        filters = []
+    else:
+        # Identity crops/scales (source already 9:16 or at target size) are
+        # left out of the filter chain
+        input_args = []
+        filters = []
+        if crop[:2] != (src_width, src_height):
+            filters.append(f'crop={crop[0]}:{crop[1]}:{crop[2]}:{crop[3]}')
+        if scaled != crop[:2]:
+            filters.append(f'scale={scaled[0]}:{scaled[1]}:flags=fast_bilinear')
+    if pad:
+        filters.append(f'pad={target_width}:{target_height}:{pad[0]}:{pad[1]}:black')
+    
+    return input_args, filters, info
+
+
+def _background_geometry(
+    src_width: int,
+    src_height: int,
     target_width: int,
     target_height: int,
     crop_mode: str = "center"
-) -> VideoFileClip:
+) -> Tuple[Tuple[int, int, int, int], Tuple[int, int], Optional[Tuple[int, int]]]:
     """
-    Crop and scale video to vertical format (9:16).
+    Compute the ffmpeg crop, scale and pad for a background clip.
     
-    Args:
-        clip: Input video clip
-        target_width: Target width (1080)
-        target_height: Target height (1920)
-        crop_mode: Crop mode
+    Cropping modes cut the centre region with the target aspect ratio, "fit"
+    scales the whole frame inside the target and letterboxes it.
     
     Returns:
-        Cropped and scaled clip
+        ((crop_w, crop_h, x, y), (scaled_w, scaled_h), (pad_x, pad_y) or None)
     """
-    clip_width, clip_height = clip.size
-    target_aspect = target_width / target_height  # 9:16 = 0.5625
-    
-    if crop_mode == "center":
-        # Center crop: maintain aspect, crop from center
-        if clip_width / clip_height > target_aspect:
-            # Clip is wider than target - crop width
-            new_width = int(clip_height * target_aspect)
-            x_center = clip_width / 2
-            x1 = int(x_center - new_width / 2)
-            x2 = int(x_center + new_width / 2)
-            clip = clip.cropped(x1=x1, y1=0, x2=x2, y2=clip_height)
-        else:
-            # Clip is taller than target - crop height
-            new_height = int(clip_width / target_aspect)
-            y_center = clip_height / 2
-            y1 = int(y_center - new_height / 2)
-            y2 = int(y_center + new_height / 2)
-            clip = clip.cropped(x1=0, y1=y1, x2=clip_width, y2=y2)
-    
-    elif crop_mode == "fit":
-        # Fit: scale to fit, may have letterboxing
-        scale_w = target_width / clip_width
-        scale_h = target_height / clip_height
-        scale = min(scale_w, scale_h)
-        
-        new_w = int(clip_width * scale)
-        new_h = int(clip_height * scale)
-        
-        clip = clip.resized(new_size=(new_w, new_h))
-        
-        # Center on black background if needed
+    target_aspect = target_width / target_height
+    
+    if crop_mode == "fit":
+        scale = min(target_width / src_width, target_height / src_height)
+        new_w = int(src_width * scale)
+        new_h = int(src_height * scale)
+        crop = (src_width, src_height, 0, 0)
         if new_w != target_width or new_h != target_height:
-            x_center = (target_width - new_w) // 2
-            y_center = (target_height - new_h) // 2
-            clip = clip.with_position((x_center, y_center))
-            # Create black background
-            from moviepy import ColorClip
-            bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0), duration=clip.duration)
-            clip = CompositeVideoClip([bg, clip])
+            return crop, (new_w, new_h), ((target_width - new_w) // 2, (target_height - new_h) // 2)
+        return crop, (new_w, new_h), None
     
-    else:  # smart or default to center
-        return crop_and_scale_vertical(clip, target_width, target_height, "center")
+    if src_width / src_height > target_aspect:
+        # Clip is wider than target - crop width
+        new_width = int(src_height * target_aspect)
+        crop = (new_width, src_height, (src_width - new_width) // 2, 0)
+    else:
+        # Clip is taller than target - crop height
+        new_height = int(src_width / target_aspect)
+        crop = (src_width, new_height, 0, (src_height - new_height) // 2)
+    return crop, (target_width, target_height), None
+
+
+class _FFmpegFrameReader:
+    """
+    Stream RGB frames from a long-running ffmpeg process.
     
-    # Final resize to exact target dimensions
-    clip = clip.resized(new_size=(target_width, target_height))
+    Frames are read sequentially; asking for an earlier frame (or jumping
+    far ahead) restarts ffmpeg at that time. With loop_frames set, the
+    source is looped endlessly with -stream_loop and frame indexes wrap
+    after that many frames.
+    """
     
-    return clip
+    def __init__(
+        self,
+        path: Path,
+        input_args: List[str],
+        filters: List[str],
+        size: Tuple[int, int],
+        fps: float,
+        loop_frames: Optional[int] = None
+    ):
+        self.path = path
+        self.input_args = input_args
+        self.filters = filters
+        self.size = size
+        self.fps = fps
+        self.loop_frames = loop_frames
+        self.frame_bytes = size[0] * size[1] * 3
+        self.proc = None
+        self.stderr = None
+        self.pos = 0  # index of the next frame ffmpeg will emit
+        self.last_frame = None
+    
+    def _start(self, index: int):
+        self.close()
+        cmd = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error']
+        seek = index % self.loop_frames if self.loop_frames else index
+        if seek:
+            cmd += ['-ss', f'{seek / self.fps:.6f}']
+        if self.loop_frames:
+            cmd += ['-stream_loop', '-1']
+        cmd += [*self.input_args, '-i', str(self.path), '-an']
+        if self.filters:
+            cmd += ['-vf', ','.join(self.filters)]
+        cmd += ['-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1']
+        # stderr goes to a file (not a pipe nobody drains) for error reports
+        self.stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=self.stderr, bufsize=self.frame_bytes)
+        self.pos = index
+    
+    def get_frame(self, t: float) -> np.ndarray:
+        index = int(t * self.fps + 1e-6)
+        if self.proc is None or index < self.pos - 1 or index > self.pos + 2 * self.fps:
+            self._start(index)
+        while self.pos <= index or self.last_frame is None:
+            data = self.proc.stdout.read(self.frame_bytes)
+            if len(data) < self.frame_bytes:
+                if self.last_frame is None:
+                    self.proc.wait()
+                    self.stderr.seek(0)
+                    error = self.stderr.read().decode(errors='replace').strip()
+                    raise IOError(f"ffmpeg returned no frames for {self.path}: {error}")
+                break  # Past the end: hold the last frame, like VideoFileClip
+            self.last_frame = np.frombuffer(data, dtype=np.uint8).reshape(self.size[1], self.size[0], 3)
+            self.pos += 1
+        return self.last_frame
+    
+    def close(self):
+        if self.proc is not None:
+            self.proc.stdout.close()
+            self.proc.terminate()
+            self.proc.wait()
+            self.proc = None
+            self.stderr.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass  # Interpreter shutdown may have torn down subprocess already
 
+
+class _BackgroundClip(VideoClip):
+    """VideoClip backed by an _FFmpegFrameReader."""
+    
+    def __init__(self, reader: _FFmpegFrameReader, duration: float):
+        self.reader = reader
+        super().__init__(frame_function=reader.get_frame, duration=duration)
+        self.fps = reader.fps
+    
+    def close(self):
+        self.reader.close()
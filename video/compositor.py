@@ -1,16 +1,56 @@
 """
 Video compositor: combines background, audio, and subtitles.
 """
+import math
+import os
+import subprocess
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
+import numpy as np
 from moviepy import (
-    VideoFileClip, AudioFileClip, CompositeVideoClip,
-    TextClip, ColorClip
+    VideoClip, VideoFileClip,
+    ImageClip, ColorClip
 )
-# Fade effects - MoviePy 2.x handles this differently
-from config import Config
+from moviepy.tools import compute_position
+from PIL import Image, ImageDraw, ImageFont
+from moviepy.config import FFMPEG_BINARY
+from config import Config, config as global_config
+from subtitles.subtitle_utils import group_words_into_lines, write_ass
 
-from .background_selector import select_background_clip, prepare_background_clip
+from .background_selector import (
+    select_background_clip, prepare_background_clip, prepare_background_file,
+    background_ffmpeg_args
+)
+from .utils import check_nvenc_available, check_ffmpeg_filter, escape_filter_path, probe
+
+
+# Fade in/out length in seconds, applied by ffmpeg to video and audio
+FADE_DURATION = 0.5
+
+# AAC bitrate for the muxed TTS audio
+AUDIO_BITRATE = '192k'
+
+# Bold sans-serif fonts for subtitle images, in order of preference
+_FONT_CANDIDATES = (
+    '/System/Library/Fonts/Supplemental/Arial Bold.ttf',  # macOS
+    r'C:\Windows\Fonts\arialbd.ttf',  # Windows
+    '/usr/share/fonts/truetype/msttcorefonts/Arial_Bold.ttf',  # Linux
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+)
+
+
+def _find_font() -> Optional[str]:
+    """Return the first installed font from _FONT_CANDIDATES (None = Pillow default)."""
+    for font in _FONT_CANDIDATES:
+        if os.path.exists(font):
+            return font
+    return None
+
+
+_DEFAULT_FONT = _find_font()
 
 
 def create_subtitle_clips(
@@ -20,7 +60,7 @@ def create_subtitle_clips(
     style: str = "standard"
 ) -> list:
     """
-    Create subtitle TextClips from timestamps.
+    Create subtitle ImageClips from timestamps.
     
     Args:
         timestamps: Word timestamps dictionary
@@ -30,10 +70,8 @@ def create_subtitle_clips(
         config: Configuration
     
     Returns:
-        List of TextClip objects
+        List of ImageClip objects
     """
-    from subtitles.subtitle_utils import group_words_into_lines
-    
     words = timestamps.get("words", [])
     if not words:
         return []
@@ -41,56 +79,342 @@ def create_subtitle_clips(
     # Group words into lines
     lines = group_words_into_lines(words, max_words_per_line=6)
     
-    # Calculate position
+    # Position lines the way libass places write_ass's styles: bottom lines
+    # end margin_bottom above the frame edge, top lines start margin_bottom
+    # below it, centre lines are centred
     video_height = config.video.height
-    if config.subtitles.position == "bottom":
-        y_pos = video_height - config.subtitles.margin_bottom
-    elif config.subtitles.position == "center":
-        y_pos = video_height // 2
-    else:
-        y_pos = config.subtitles.margin_bottom
+    position = config.subtitles.position
+    margin = config.subtitles.margin_bottom
+    
+    # Clamp all end times to the video in one vectorized pass; lines that
+    # would start after the video ends are dropped
+    starts = np.fromiter((line["start"] for line in lines), dtype=np.float64, count=len(lines))
+    ends = np.minimum(
+        np.fromiter((line["end"] for line in lines), dtype=np.float64, count=len(lines)),
+        video_duration
+    )
+    visible = np.flatnonzero(ends > starts)
     
     subtitle_clips = []
     
-    for line in lines:
-        text = line["text"]
-        start_time = line["start"]
-        end_time = min(line["end"], video_duration)
+    for i in visible.tolist():
+        line = lines[i]
+        start_time = float(starts[i])
+        end_time = float(ends[i])
         
-        # Create text clip (MoviePy 2.x compatible)
-        # Use system font - try Arial, fallback to default
-        try:
-            font_name = '/System/Library/Fonts/Supplemental/Arial Bold.ttf'
-            import os
-            if not os.path.exists(font_name):
-                font_name = None  # Use default font
-        except:
-            font_name = None
+        bitmap = _render_text_bitmap(
+            line["text"],
+            _DEFAULT_FONT,
+            config.subtitles.font_size,
+            config.subtitles.font_color,
+            config.subtitles.stroke_color,
+            config.subtitles.stroke_width,
+            config.video.width - 100
+        )
+        if position == "center":
+            y_pos = (video_height - bitmap.shape[0]) // 2
+        elif position == "top":
+            y_pos = margin
+        else:
+            y_pos = video_height - margin - bitmap.shape[0]
         
-        txt_clip = TextClip(
-            text=text,
-            font_size=config.subtitles.font_size,
-            color=config.subtitles.font_color,
-            font=font_name,
-            stroke_color=config.subtitles.stroke_color,
-            stroke_width=config.subtitles.stroke_width,
-            method='caption',
-            size=(config.video.width - 100, None),
-            text_align='center'
-        ).with_position(('center', y_pos)).with_start(start_time).with_duration(end_time - start_time)
+        txt_clip = (
+            ImageClip(bitmap, transparent=True)
+            .with_position(('center', y_pos))
+            .with_start(start_time)
+            .with_duration(end_time - start_time)
+        )
         
         subtitle_clips.append(txt_clip)
     
     return subtitle_clips
 
 
+@lru_cache(maxsize=128)
+def _render_text_bitmap(
+    text: str,
+    font: Optional[str],
+    size: int,
+    color: str,
+    stroke_color: str,
+    stroke_width: int,
+    box_width: int,
+    interline: int = 4
+) -> np.ndarray:
+    """
+    Rasterize centred, word-wrapped subtitle text to an RGBA array.
+    
+    Lays text out like TextClip(method='caption', text_align='center'), but
+    is memoized so repeated lines (re-renders, style or voice sweeps) are
+    only rasterized once per process. The returned array is read-only.
+    
+    Args:
+        text: Text to draw
+        font: Path to a TrueType font (None = Pillow default font)
+        size: Font size in pixels
+        color: Fill color
+        stroke_color: Outline color
+        stroke_width: Outline width in pixels
+        box_width: Width to wrap text into
+        interline: Extra spacing between lines in pixels
+    
+    Returns:
+        HxWx4 uint8 array cropped to the text (at most box_width wide)
+    """
+    pil_font = ImageFont.truetype(font, size) if font else ImageFont.load_default(size)
+    draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    
+    # Greedy word wrap to the box width
+    rows = []
+    for word in text.split():
+        candidate = f"{rows[-1]} {word}" if rows else word
+        if rows and draw.textlength(candidate, font=pil_font) + 2 * stroke_width > box_width:
+            rows.append(word)
+        elif rows:
+            rows[-1] = candidate
+        else:
+            rows.append(word)
+    wrapped = "\n".join(rows)
+    
+    left, top, right, bottom = draw.multiline_textbbox(
+        (0, 0), wrapped, font=pil_font, spacing=interline,
+        align="center", stroke_width=stroke_width, anchor="la"
+    )
+    # Crop to the text's bounding box; the caller centres it horizontally
+    img = Image.new("RGBA", (math.ceil(right - left), math.ceil(bottom)), (0, 0, 0, 0))
+    ImageDraw.Draw(img).multiline_text(
+        (-left, 0),
+        wrapped,
+        fill=color,
+        font=pil_font,
+        spacing=interline,
+        align="center",
+        stroke_width=stroke_width,
+        stroke_fill=stroke_color,
+        anchor="la"
+    )
+    
+    bitmap = np.asarray(img)
+    bitmap.flags.writeable = False
+    return bitmap
+
+
+def _paste_subtitles(background: VideoClip, subtitle_clips: List[ImageClip]) -> VideoClip:
+    """
+    Overlay pre-rendered subtitle ImageClips onto a background clip.
+    
+    CompositeVideoClip converts every layer to Pillow images and alpha-
+    composites a full-frame canvas per frame. Here each subtitle's RGBA image
+    and position are prepared once, and a frame showing a subtitle costs a
+    single masked Pillow paste over the text's bounding box.
+    
+    Args:
+        background: Clip to draw on (its size is the output size)
+        subtitle_clips: ImageClips from create_subtitle_clips
+    
+    Returns:
+        Clip with the subtitles drawn on
+    """
+    overlays = []
+    for clip in subtitle_clips:
+        rgba = Image.fromarray(np.dstack([
+            clip.img, np.rint(clip.mask.img * 255).astype(np.uint8)
+        ]))
+        pos = compute_position(rgba.size, background.size, clip.pos(0), clip.relative_pos)
+        overlays.append((clip.start, clip.end, rgba, tuple(int(p) for p in pos)))
+    
+    def paste(get_frame, t):
+        frame = get_frame(t)
+        active = [(image, pos) for start, end, image, pos in overlays if start <= t < end]
+        if not active:
+            return frame
+        img = Image.fromarray(frame.astype(np.uint8, copy=False))  # ColorClip frames are int64
+        for image, pos in active:
+            img.paste(image, pos, image)
+        return np.asarray(img)
+    
+    return background.transform(paste)
+
+
+def _fade_filters(duration: float) -> Tuple[str, str]:
+    """ffmpeg fade/afade filters for FADE_DURATION in and out of a clip."""
+    fade_out_start = max(duration - FADE_DURATION, 0)
+    video = (f'fade=t=in:st=0:d={FADE_DURATION},'
+             f'fade=t=out:st={fade_out_start:.3f}:d={FADE_DURATION}')
+    audio = (f'afade=t=in:st=0:d={FADE_DURATION},'
+             f'afade=t=out:st={fade_out_start:.3f}:d={FADE_DURATION}')
+    return video, audio
+
+
+def _video_codec_args(config: Config, nvenc: bool = True) -> List[str]:
+    """ffmpeg video encoder options: h264_nvenc when allowed and available, else the configured codec."""
+    video_cfg = config.video
+    if nvenc and check_nvenc_available():
+        return ['-c:v', 'h264_nvenc', '-preset', 'p4', '-tune', 'hq',
+                '-rc', 'vbr', '-cq', '23', '-b:v', video_cfg.bitrate]
+    threads = video_cfg.encode_threads or os.cpu_count() or 4
+    return ['-c:v', video_cfg.codec, '-preset', video_cfg.encode_preset,
+            '-b:v', video_cfg.bitrate, '-threads', str(threads)]
+
+
+def _compose_with_ffmpeg(
+    background_path: Optional[Path],
+    audio_path: Path,
+    duration: float,
+    output_path: Path,
+    config: Config,
+    video_filters: List[str]
+) -> Path:
+    """
+    Render the whole video with one ffmpeg filter graph.
+    
+    The background is looped, cropped and scaled (in the NVDEC decoder when
+    possible), the extra video filters (subtitles) and fades are applied and
+    the result is encoded with the TTS audio, without any frame passing
+    through Python.
+    
+    Args:
+        background_path: Path to background clip (None = black background)
+        audio_path: Path to audio file to mux in
+        duration: Output duration in seconds
+        output_path: Path to save encoded video
+        config: Configuration object
+        video_filters: ffmpeg filters applied to the target-size background
+    
+    Returns:
+        Path to encoded video
+    """
+    video_cfg = config.video
+    video_fades, audio_fades = _fade_filters(duration)
+    
+    def build_cmd(hwaccel: bool, nvenc: bool) -> List[str]:
+        if background_path:
+            input_args, filters, _ = background_ffmpeg_args(
+                background_path, video_cfg.width, video_cfg.height, video_cfg.crop_mode, hwaccel
+            )
+            inputs = [*input_args, '-stream_loop', '-1', '-i', str(background_path)]
+        else:
+            filters = []
+            inputs = ['-f', 'lavfi', '-i',
+                      f'color=c=black:s={video_cfg.width}x{video_cfg.height}:r={video_cfg.fps}']
+        graph = ','.join([*filters, 'setsar=1', f'fps={video_cfg.fps}', *video_filters, video_fades])
+        
+        return [
+            FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+            *inputs,
+            '-i', str(audio_path),
+            '-filter_complex', f'[0:v]{graph}[v];[1:a]{audio_fades}[a]',
+            '-map', '[v]', '-map', '[a]',
+            '-t', f'{duration:.3f}',
+            *_video_codec_args(config, nvenc),
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', AUDIO_BITRATE,
+            '-movflags', '+faststart',
+            str(output_path)
+        ]
+    
+    # NVDEC decoders can be listed without a usable GPU, and NVENC can fail
+    # at runtime (session limit, out of VRAM): retry with CPU decode, then
+    # with the software encoder too
+    tried = []
+    for hwaccel, nvenc in ((True, True), (False, True), (False, False)):
+        cmd = build_cmd(hwaccel, nvenc)
+        if cmd in tried:
+            continue
+        tried.append(cmd)
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0:
+            return output_path
+    
+    raise RuntimeError(f"ffmpeg encode failed: {result.stderr.decode(errors='replace').strip()}")
+
+
+def _encode_frames(
+    clip: VideoClip,
+    audio_path: Path,
+    output_path: Path,
+    config: Config,
+    duration: float
+) -> Path:
+    """
+    Encode a clip's frames and mux audio with a direct ffmpeg subprocess.
+    
+    Frames are piped to ffmpeg as raw video. Uses the h264_nvenc hardware
+    encoder when available and re-encodes with the configured software
+    codec if NVENC fails at runtime.
+    
+    Args:
+        clip: Clip to encode (frames are rendered at config.video.fps)
+        audio_path: Path to audio file to mux in
+        output_path: Path to save encoded video
+        config: Configuration object
+        duration: Video duration in seconds (positions the fade out)
+    
+    Returns:
+        Path to encoded video
+    """
+    video_cfg = config.video
+    video_fades, audio_fades = _fade_filters(duration)
+    
+    # Contiguous frames are written straight from their buffer; anything
+    # else (strided views, other dtypes) is copied into one reused buffer
+    # instead of allocating a new bytes object per frame
+    buf = np.empty((video_cfg.height, video_cfg.width, 3), dtype=np.uint8)
+    
+    for nvenc in (True, False):
+        codec_args = _video_codec_args(config, nvenc)
+        cmd = [
+            FFMPEG_BINARY, '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f'{video_cfg.width}x{video_cfg.height}', '-r', str(video_cfg.fps),
+            '-i', 'pipe:0',
+            '-i', str(audio_path),
+            '-map', '0:v', '-map', '1:a',
+            '-vf', video_fades,
+            '-af', audio_fades,
+            *codec_args,
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', AUDIO_BITRATE,
+            '-shortest',
+            '-movflags', '+faststart',
+            str(output_path)
+        ]
+        
+        # stderr goes to a file: a pipe nobody reads until the end could
+        # fill up and block ffmpeg while frames are still being written
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr)
+            try:
+                for frame in clip.iter_frames(fps=video_cfg.fps, dtype='uint8'):
+                    if frame.dtype == np.uint8 and frame.flags.c_contiguous and frame.shape == buf.shape:
+                        proc.stdin.write(frame.data)
+                    else:
+                        np.copyto(buf, frame, casting='unsafe')
+                        proc.stdin.write(buf.data)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its error is reported below
+            finally:
+                proc.stdin.close()
+            
+            if proc.wait() == 0:
+                return output_path
+            stderr.seek(0)
+            error = stderr.read().decode(errors='replace').strip()
+        
+        if codec_args[1] != 'h264_nvenc':
+            break  # Already the software encoder: nothing left to fall back to
+    
+    raise RuntimeError(f"ffmpeg encode failed: {error}")
+
+
 def compose_video(
     background_path: Optional[Path],
     audio_path: Path,
     timestamps: Dict,
     output_path: Path,
     config: Optional[Config] = None,
-    subtitle_style: str = "standard"
+    subtitle_style: str = "standard",
+    ass_path: Optional[Path] = None
 ) -> Path:
     """
     Compose final video: background + audio + subtitles.
@@ -102,20 +426,58 @@ def compose_video(
         output_path: Path to save final video
         config: Configuration object
         subtitle_style: Subtitle style ("standard" or "karaoke")
+        ass_path: ASS file from write_ass to burn in (None = write one from
+            timestamps into a temp dir)
     
     Returns:
         Path to generated video
     """
     if config is None:
-        from config import config as global_config
         config = global_config
     
-    # Load audio
-    audio = AudioFileClip(str(audio_path))
-    duration = audio.duration
+    # Audio is only ever muxed by ffmpeg, so just read its duration
+    duration = probe(audio_path)["duration"]
     
-    # Load or create background
-    if background_path and background_path.exists():
+    has_background = bool(background_path and background_path.exists())
+    if has_background and config.video.cache_backgrounds:
+        # Reuse a pre-cropped, pre-scaled copy shared by every render
+        background_path = prepare_background_file(
+            background_path,
+            config.video.width,
+            config.video.height,
+            config.video.crop_mode,
+            config.paths.bg_cache
+        )
+    
+    # Common case: subtitles go through ffmpeg's libass filter, so the whole
+    # render is a single ffmpeg graph
+    if check_ffmpeg_filter('ass'):
+        words = timestamps.get("words", [])
+        with tempfile.TemporaryDirectory() as subs_dir:
+            video_filters = []
+            if ass_path is None and words:
+                lines = group_words_into_lines(words, max_words_per_line=6)
+                ass_path = write_ass(lines, Path(subs_dir) / "subs.ass", config, subtitle_style)
+            if ass_path is not None:
+                ass_filter = f"ass=filename={escape_filter_path(ass_path)}"
+                if config.paths.fonts.is_dir():
+                    ass_filter += f":fontsdir={escape_filter_path(config.paths.fonts)}"
+                video_filters.append(ass_filter)
+            
+            _compose_with_ffmpeg(
+                background_path if has_background else None,
+                audio_path,
+                duration,
+                output_path,
+                config,
+                video_filters
+            )
+        
+        return output_path
+    
+    # Fallback for ffmpeg builds without libass: composite subtitle images
+    # in MoviePy and pipe the frames to the encoder
+    if has_background:
         background = prepare_background_clip(
             background_path,
             duration,
@@ -131,38 +493,24 @@ def compose_video(
             duration=duration
         )
     
-    # Create subtitle clips
     subtitle_clips = create_subtitle_clips(timestamps, duration, config, subtitle_style)
     
-    # Composite all elements (MoviePy 2.x uses with_audio)
-    clips_to_composite = [background.with_audio(audio)]
-    
+    # Overlay subtitles
+    final_video = background
     if subtitle_clips:
-        clips_to_composite.extend(subtitle_clips)
-    
-    final_video = CompositeVideoClip(clips_to_composite, size=(config.video.width, config.video.height))
-    
-    # Add fade in/out (MoviePy 2.x compatible)
-    try:
-        final_video = final_video.with_fadein(0.5).with_fadeout(0.5)
-    except AttributeError:
-        # If fade methods not available, skip fades
-        pass
-    
-    # Write video
-    final_video.write_videofile(
-        str(output_path),
-        fps=config.video.fps,
-        codec=config.video.codec,
-        bitrate=config.video.bitrate,
-        audio_codec='aac',
-        preset='medium',
-        threads=4
+        final_video = _paste_subtitles(final_video, subtitle_clips)
+    
+    # Write video (frames piped straight into ffmpeg, audio muxed from file)
+    _encode_frames(
+        final_video,
+        audio_path,
+        output_path,
+        config,
+        duration
     )
     
     # Cleanup
     final_video.close()
-    audio.close()
     background.close()
     for clip in subtitle_clips:
         clip.close()
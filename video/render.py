@@ -1,14 +1,18 @@
 """
 Main video rendering pipeline.
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, List, Tuple, Union
 from datetime import datetime
+import copy
+import dataclasses
 import json
 import logging
+import os
 
-from config import Config
-from tts.tts_router import generate_tts
+from config import Config, config as global_config
+from tts.tts_router import generate_tts, generate_tts_batch
 from subtitles.subtitle_utils import generate_subtitles
 from .background_selector import select_background_clip
 from .compositor import compose_video
@@ -16,6 +20,10 @@ from .compositor import compose_video
 
 logger = logging.getLogger(__name__)
 
+# Consumer NVIDIA GPUs limit concurrent NVENC sessions, so batch renders
+# never run more encodes than this at once
+MAX_CONCURRENT_ENCODES = 2
+
 
 def render_video(
     script_text: str,
@@ -40,7 +48,6 @@ def render_video(
         Tuple of (video_path, metadata_dict)
     """
     if config is None:
-        from config import config as global_config
         config = global_config
     
     # Create output directory
@@ -50,15 +57,133 @@ def render_video(
     
     logger.info(f"Starting render: {base_name}")
     
-    # Step 1: Generate TTS audio with timestamps
-    logger.info("Generating TTS audio...")
-    audio_path, timestamps = generate_tts(
-        text=script_text,
-        output_path=output_dir / base_name,
-        voice_profile=voice_profile,
-        config=config
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Background selection is independent disk I/O: overlap it with TTS
+        bg_future = None
+        if background_clip is None:
+            bg_future = executor.submit(select_background_clip, config.paths.background_clips)
+        
+        # Step 1: Generate TTS audio with timestamps
+        logger.info("Generating TTS audio...")
+        audio_path, timestamps = generate_tts(
+            text=script_text,
+            output_path=output_dir / base_name,
+            voice_profile=voice_profile,
+            config=config
+        )
+        
+        bg_clip_path = bg_future.result() if bg_future else background_clip
+    
+    return _finish_render(
+        script_text, output_dir, base_name, timestamp, audio_path, timestamps,
+        voice_profile, subtitle_style, bg_clip_path, config
     )
+
+
+def render_video_batch(
+    scripts: List[str],
+    output_dir: Path,
+    voice_profile: Optional[str] = None,
+    subtitle_style: str = "standard",
+    max_workers: int = 4,
+    return_exceptions: bool = False,
+    config: Optional[Config] = None
+) -> List[Union[Tuple[Path, Dict], Exception]]:
+    """
+    Render several scripts, overlapping TTS requests and encodes.
+    
+    TTS for the whole batch runs concurrently up front, then videos are
+    composed on a small thread pool. Concurrent encodes are capped at
+    MAX_CONCURRENT_ENCODES since consumer GPUs only allow a few NVENC
+    sessions at once, and share the CPU's encode threads between them.
+    
+    Args:
+        scripts: Input text scripts
+        output_dir: Directory to save output files
+        voice_profile: Meme voice profile name applied to every script
+        subtitle_style: "standard" or "karaoke"
+        max_workers: Maximum number of scripts in flight at once
+        return_exceptions: Return a failed script's exception in its slot
+            instead of raising it
+        config: Configuration object (uses global config if not provided)
+    
+    Returns:
+        List of (video_path, metadata_dict) tuples (or exceptions), in input order
+    """
+    if config is None:
+        config = global_config
+    if not scripts:
+        return []
+    
+    encodes = max(1, min(max_workers, MAX_CONCURRENT_ENCODES, len(scripts)))
+    if config.video.encode_threads is None:
+        # Split the cores between concurrent encodes instead of giving each
+        # encoder all of them
+        config = copy.copy(config)
+        config.video = dataclasses.replace(
+            config.video, encode_threads=max(1, (os.cpu_count() or 4) // encodes)
+        )
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Renders started in the same second need distinct names
+    base_names = [f"render_{timestamp}_{i:03d}" for i in range(len(scripts))]
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        bg_future = executor.submit(
+            lambda: [select_background_clip(config.paths.background_clips) for _ in scripts]
+        )
+        
+        logger.info(f"Generating TTS audio for {len(scripts)} scripts...")
+        tts_results = generate_tts_batch(
+            scripts,
+            [output_dir / name for name in base_names],
+            voice_profile=voice_profile,
+            config=config,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions
+        )
+        
+        bg_clip_paths = bg_future.result()
     
+    def finish(script_text, base_name, tts_result, bg_clip_path):
+        if isinstance(tts_result, Exception):
+            raise tts_result
+        audio_path, timestamps = tts_result
+        return _finish_render(
+            script_text, output_dir, base_name, timestamp, audio_path, timestamps,
+            voice_profile, subtitle_style, bg_clip_path, config
+        )
+    
+    with ThreadPoolExecutor(max_workers=encodes) as executor:
+        futures = [
+            executor.submit(finish, *item)
+            for item in zip(scripts, base_names, tts_results, bg_clip_paths)
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+
+def _finish_render(
+    script_text: str,
+    output_dir: Path,
+    base_name: str,
+    timestamp: str,
+    audio_path: Path,
+    timestamps: Dict,
+    voice_profile: Optional[str],
+    subtitle_style: str,
+    bg_clip_path: Optional[Path],
+    config: Config
+) -> Tuple[Path, Dict]:
+    """Run the post-TTS steps: subtitles, composition, metadata."""
     # Step 2: Generate subtitles
     logger.info("Generating subtitles...")
     subtitle_path = generate_subtitles(
@@ -68,16 +193,8 @@ def render_video(
         config=config
     )
     
-    # Step 3: Select background (if not provided)
-    if background_clip is None:
-        bg_clip_path = select_background_clip(
-            config.paths.background_clips,
-            timestamps.get("duration", 30.0)
-        )
-    else:
-        bg_clip_path = background_clip
-    
-    # Step 4: Compose final video
+    # Step 3: Compose final video (a karaoke .ass file is burned in as is;
+    # SRT output needs the compositor's own styled ASS)
     logger.info("Composing video...")
     video_path = compose_video(
         background_path=bg_clip_path,
@@ -85,7 +202,8 @@ def render_video(
         timestamps=timestamps,
         output_path=output_dir / f"{base_name}.mp4",
         config=config,
-        subtitle_style=subtitle_style
+        subtitle_style=subtitle_style,
+        ass_path=subtitle_path if subtitle_path.suffix == ".ass" else None
     )
     
     # Create metadata
@@ -111,4 +229,3 @@ def render_video(
     logger.info(f"Render complete: {video_path}")
     
     return video_path, metadata
-
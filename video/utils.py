@@ -1,8 +1,20 @@
 """
 Utility functions for video processing.
 """
+import os
+import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+try:
+    import cv2
+except ImportError:  # Optional dependency
+    cv2 = None
 
 
 def get_supported_video_formats() -> List[str]:
@@ -14,3 +26,170 @@ def validate_video_file(path: Path) -> bool:
     """Check if file is a valid video file."""
     return path.exists() and path.suffix.lower() in get_supported_video_formats()
 
+
+@lru_cache(maxsize=None)
+def check_nvenc_available() -> bool:
+    """
+    Check (once per process) whether ffmpeg can encode with h264_nvenc.
+    
+    The encoder being listed isn't enough (no GPU/driver), so a single
+    tiny frame is test-encoded as well.
+    """
+    try:
+        encoders = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-encoders'],
+            capture_output=True, text=True, check=True
+        ).stdout
+        if 'h264_nvenc' not in encoders:
+            return False
+        
+        result = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+             '-f', 'lavfi', '-i', 'color=c=black:s=256x256',
+             '-frames:v', '1', '-c:v', 'h264_nvenc', '-f', 'null', '-'],
+            capture_output=True
+        )
+        return result.returncode == 0
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def check_nvdec_available(codec_name: str) -> bool:
+    """
+    Check (once per codec) whether ffmpeg has a CUVID/NVDEC decoder for it.
+    
+    Args:
+        codec_name: Source codec as reported by ffmpeg (e.g. "h264", "hevc")
+    """
+    try:
+        decoders = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-decoders'],
+            capture_output=True, text=True, check=True
+        ).stdout
+        hwaccels = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-hwaccels'],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return f'{codec_name}_cuvid' in decoders.split() and 'cuda' in hwaccels.split()
+
+
+@lru_cache(maxsize=None)
+def check_ffmpeg_filter(name: str) -> bool:
+    """Check (once per filter) whether ffmpeg was built with a video filter, e.g. "ass"."""
+    try:
+        filters = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-filters'],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return any(line.split()[1:2] == [name] for line in filters.splitlines())
+
+
+def escape_filter_path(path: Path) -> str:
+    """
+    Escape a file path for use as an ffmpeg filter option value.
+    
+    Two levels apply: the filter's own option parser (\\ ' :) and then the
+    filtergraph parser (\\ ' , ; [ ]).
+    """
+    value = str(path).replace("\\", "/")
+    for level in ("\\':", "\\',;[]"):
+        value = "".join("\\" + c if c in level else c for c in value)
+    return value
+
+
+def probe(path: Path) -> Dict[str, Any]:
+    """
+    Read container/stream metadata without decoding any frames.
+    
+    Results are memoized per (path, mtime), so repeated calls for the same
+    file (e.g. a background reused across a batch) only parse headers once.
+    The returned dict is shared between callers and must not be modified.
+    
+    Args:
+        path: Path to a video or audio file
+    
+    Returns:
+        Dict with duration, plus width, height (as displayed, i.e. after
+        rotation), rotation, fps, n_frames and codec for the first video
+        stream (None when there is no video stream)
+    """
+    return _probe(str(path), os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _probe(path: str, mtime_ns: int) -> Dict[str, Any]:
+    # No ffprobe ships with imageio-ffmpeg, so parse `ffmpeg -i` output via MoviePy
+    infos = ffmpeg_parse_infos(path)
+    width = height = None
+    rotation = infos.get("video_rotation", 0)
+    if infos.get("video_found"):
+        width, height = infos["video_size"]
+        if rotation in (90, 270):
+            width, height = height, width
+    return {
+        "duration": infos.get("duration"),
+        "width": width,
+        "height": height,
+        "rotation": rotation,
+        "fps": infos.get("video_fps"),
+        "n_frames": infos.get("video_n_frames"),
+        "codec": infos.get("video_codec_name"),
+    }
+
+
+def sample_frames(path: Path, times: Sequence[float]) -> List[np.ndarray]:
+    """
+    Decode only the frames at the given times (e.g. for thumbnails or
+    smart-crop analysis) instead of iterating over every frame.
+    
+    With OpenCV installed (optional, not in requirements.txt:
+    pip install opencv-python-headless), frames in between are skipped with
+    grab() (demux only) and only the wanted ones are decoded with
+    retrieve(). Without it, ffmpeg seeks to each time and decodes a single
+    frame.
+    
+    Args:
+        path: Path to video file
+        times: Sample times in seconds (clamped to the last frame)
+    
+    Returns:
+        List of HxWx3 uint8 RGB frames, in the order of times
+    """
+    info = probe(path)
+    last_index = max((info["n_frames"] or int(info["duration"] * info["fps"])) - 1, 0)
+    indexes = [min(max(int(t * info["fps"]), 0), last_index) for t in times]
+    
+    if cv2 is not None:
+        frames = {}
+        cap = cv2.VideoCapture(str(path))
+        try:
+            wanted = set(indexes)
+            index = 0
+            while wanted and cap.grab():
+                if index in wanted:
+                    ok, frame = cap.retrieve()
+                    if ok:
+                        frames[index] = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    wanted.discard(index)
+                index += 1
+        finally:
+            cap.release()
+        if len(frames) == len(set(indexes)):
+            return [frames[i] for i in indexes]
+    
+    width, height = info["width"], info["height"]
+    frames = []
+    for index in indexes:
+        data = subprocess.run(
+            [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+             '-ss', f'{index / info["fps"]:.6f}', '-i', str(path),
+             '-frames:v', '1', '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'],
+            capture_output=True, check=True
+        ).stdout
+        frames.append(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3))
+    return frames